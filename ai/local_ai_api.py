@@ -30,6 +30,18 @@ Usage (inside the Django workspace):
 
 The helper automatically injects the project UUID header and falls back to
 reading executor/.env if environment variables are missing.
+
+Set AI_RECORD_MODE to "record", "replay" or "replay-or-record" to save
+create_response results to (or serve them from) the on-disk store at
+AI_RECORD_PATH; see ai.recorder. Pass {"record_mode": ...} in options to
+override per call.
+
+Set AI_PROXY_BASE_URLS to a comma-separated list of "url=weight" entries to
+spread submissions across several proxies; see ai.router. Each proxy issues
+its own ai_request_id values, so status polls must go to the endpoint that
+accepted the job: pass a dict as options["route"] to request() and it is filled
+with {"base_url": ...}; hand that base_url to fetch_status()/await_response().
+create_response() does this for you.
 """
 
 from __future__ import annotations
@@ -38,10 +50,13 @@ import json
 import os
 import time
 import ssl
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 from urllib import error as urlerror
 from urllib import request as urlrequest
 
+from .recorder import RECORD_MODES, canonical_key, get_store
+from .router import EndpointRouter, parse_endpoints
+
 __all__ = [
     "LocalAIApi",
     "create_response",
@@ -93,7 +108,38 @@ def create_response(params: Dict[str, Any], options: Optional[Dict[str, Any]] =
     if not payload.get("model"):
         payload["model"] = cfg["default_model"]
 
-    initial = request(options.get("path"), payload, options)
+    record_mode = str(options.get("record_mode") or cfg["record_mode"]).lower()
+    if record_mode not in RECORD_MODES:
+        return {
+            "success": False,
+            "error": "record_mode_invalid",
+            "message": f"Unknown record mode {record_mode!r}; expected one of {', '.join(RECORD_MODES)}.",
+        }
+    if record_mode == "off":
+        return _create_response(payload, options)
+
+    store = get_store(cfg["record_path"])
+    key = canonical_key(options.get("path"), payload)
+    if record_mode in ("replay", "replay-or-record"):
+        recorded = store.get(key)
+        if recorded is not None:
+            return recorded
+        if record_mode == "replay":
+            return {
+                "success": False,
+                "error": "replay_miss",
+                "message": f"No recorded AI response for request {key}.",
+            }
+
+    result = _create_response(payload, options)
+    if result.get("success"):
+        store.put(key, result)
+    return result
+
+
+def _create_response(payload: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    route = options.get("route") if isinstance(options.get("route"), dict) else {}
+    initial = request(options.get("path"), payload, {**options, "route": route})
     if not initial.get("success"):
         return initial
 
@@ -107,6 +153,7 @@ def create_response(params: Dict[str, Any], options: Optional[Dict[str, Any]] =
             "timeout": poll_timeout,
             "headers": options.get("headers"),
             "timeout_per_call": options.get("timeout"),
+            "base_url": route.get("base_url"),
         })
 
     return initial
@@ -136,7 +183,6 @@ def request(path: Optional[str], payload: Dict[str, Any], options: Optional[Dict
     if "project_uuid" not in payload and project_uuid:
         payload["project_uuid"] = project_uuid
 
-    url = _build_url(resolved_path, cfg["base_url"])
     opt_timeout = options.get("timeout")
     timeout = int(cfg["timeout"] if opt_timeout is None else opt_timeout)
     verify_tls = options.get("verify_tls", cfg["verify_tls"])
@@ -154,7 +200,20 @@ def request(path: Optional[str], payload: Dict[str, Any], options: Optional[Dict
                 headers[name.strip()] = value.strip()
 
     body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    return _http_request(url, "POST", body, headers, timeout, verify_tls)
+    router: EndpointRouter = cfg["router"]
+    pinned = options.get("base_url")
+    tried = []
+    while True:
+        base_url = pinned or router.choose(exclude=tried)
+        result, sent = _routed_request(router, base_url, _build_url(resolved_path, base_url), "POST", body,
+                                       headers, timeout, verify_tls)
+        tried.append(base_url)
+        # Only resubmit elsewhere when this proxy cannot have accepted the job; a read
+        # timeout or a 504 after the body went out may still have queued it.
+        if pinned or len(tried) >= len(router) or (sent and result.get("status") not in (502, 503)):
+            if isinstance(options.get("route"), dict):
+                options["route"]["base_url"] = base_url
+            return result
 
 
 def fetch_status(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -171,7 +230,9 @@ def fetch_status(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -
         }
 
     status_path = _resolve_status_path(ai_request_id, cfg)
-    url = _build_url(status_path, cfg["base_url"])
+    router: EndpointRouter = cfg["router"]
+    base_url = options.get("base_url") or router.choose()
+    url = _build_url(status_path, base_url)
 
     opt_timeout = options.get("timeout")
     timeout = int(cfg["timeout"] if opt_timeout is None else opt_timeout)
@@ -188,7 +249,7 @@ def fetch_status(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -
                 name, value = header.split(":", 1)
                 headers[name.strip()] = value.strip()
 
-    return _http_request(url, "GET", None, headers, timeout, verify_tls)
+    return _routed_request(router, base_url, url, "GET", None, headers, timeout, verify_tls)[0]
 
 
 def await_response(ai_request_id: Any, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -207,6 +268,7 @@ def await_response(ai_request_id: Any, options: Optional[Dict[str, Any]] = None)
             "headers": options.get("headers"),
             "timeout": per_call_timeout,
             "verify_tls": options.get("verify_tls"),
+            "base_url": options.get("base_url"),
         })
         if status_resp.get("success"):
             data = status_resp.get("data") or {}
@@ -303,6 +365,7 @@ def _config() -> Dict[str, Any]:
     _ensure_env_loaded()
 
     base_url = os.getenv("AI_PROXY_BASE_URL", "https://flatlogic.com")
+    endpoints = parse_endpoints(os.getenv("AI_PROXY_BASE_URLS", "")) or [(base_url, 1.0)]
     project_id = os.getenv("PROJECT_ID") or None
     responses_path = os.getenv("AI_RESPONSES_PATH")
     if not responses_path and project_id:
@@ -310,6 +373,7 @@ def _config() -> Dict[str, Any]:
 
     _CONFIG_CACHE = {
         "base_url": base_url,
+        "router": EndpointRouter(endpoints),
         "responses_path": responses_path,
         "project_id": project_id,
         "project_uuid": os.getenv("PROJECT_UUID"),
@@ -317,6 +381,9 @@ def _config() -> Dict[str, Any]:
         "default_model": os.getenv("AI_DEFAULT_MODEL", "gpt-5-mini"),
         "timeout": int(os.getenv("AI_TIMEOUT", "30")),
         "verify_tls": os.getenv("AI_VERIFY_TLS", "true").lower() not in {"0", "false", "no"},
+        "record_mode": os.getenv("AI_RECORD_MODE", "off").lower(),
+        "record_path": os.getenv("AI_RECORD_PATH")
+        or os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings"),
     }
     return _CONFIG_CACHE
 
@@ -339,11 +406,37 @@ def _resolve_status_path(ai_request_id: Any, cfg: Dict[str, Any]) -> str:
     return f"{base_path}/{ai_request_id}/status"
 
 
+def _routed_request(router: EndpointRouter, base_url: str, url: str, method: str, body: Optional[bytes],
+                    headers: Dict[str, str], timeout: int, verify_tls: bool) -> Tuple[Dict[str, Any], bool]:
+    """Run _http_exchange and feed the outcome to the router's moving averages."""
+    started = time.monotonic()
+    result, sent = _http_exchange(url, method, body, headers, timeout, verify_tls)
+    healthy = "status" in result and not _is_gateway_error(result)
+    router.record(base_url, time.monotonic() - started, healthy)
+    return result, sent
+
+
+def _is_gateway_error(result: Dict[str, Any]) -> bool:
+    return result.get("status") in (502, 503, 504)
+
+
 def _http_request(url: str, method: str, body: Optional[bytes], headers: Dict[str, str],
                   timeout: int, verify_tls: bool) -> Dict[str, Any]:
     """
     Shared HTTP helper for GET/POST requests.
     """
+    return _http_exchange(url, method, body, headers, timeout, verify_tls)[0]
+
+
+def _http_exchange(url: str, method: str, body: Optional[bytes], headers: Dict[str, str],
+                   timeout: int, verify_tls: bool) -> Tuple[Dict[str, Any], bool]:
+    """
+    Perform the request; the flag is False only when it never reached the proxy.
+
+    urllib wraps failures while connecting or sending (refused, DNS, connect
+    timeout) in URLError; anything raised later happened after the full
+    request was delivered.
+    """
     req = urlrequest.Request(url, data=body, method=method.upper())
     for name, value in headers.items():
         req.add_header(name, value)
@@ -366,7 +459,7 @@ def _http_request(url: str, method: str, body: Optional[bytes], headers: Dict[st
             "success": False,
             "error": "request_failed",
             "message": str(exc),
-        }
+        }, not isinstance(exc, urlerror.URLError)
 
     decoded = None
     if response_body:
@@ -380,7 +473,7 @@ def _http_request(url: str, method: str, body: Optional[bytes], headers: Dict[st
             "success": True,
             "status": status,
             "data": decoded if decoded is not None else response_body,
-        }
+        }, True
 
     error_message = "AI proxy request failed"
     if isinstance(decoded, dict):
@@ -393,7 +486,7 @@ def _http_request(url: str, method: str, body: Optional[bytes], headers: Dict[st
         "status": status,
         "error": error_message,
         "response": decoded if decoded is not None else response_body,
-    }
+    }, True
 
 
 def _ensure_env_loaded() -> None:
@@ -0,0 +1,187 @@
+"""
+RecordingStore — compact on-disk store of AI proxy responses for record/replay.
+
+Responses are keyed by a SHA-256 of the canonical request payload and appended
+to ``data.bin`` as zlib-compressed JSON. ``index.json`` maps each key to its
+``[offset, length]`` in the data file, so replay is one seek and one read with
+no network access.
+
+Several processes may share a store: writers take an exclusive ``flock`` on
+``store.lock`` and merge their entry into the index on disk, readers take a
+shared lock and pick up entries recorded elsewhere. Re-recording a key with an
+identical response writes nothing, and the data file is compacted once
+superseded blobs outweigh live ones.
+
+Enable through the environment (read by ``ai.local_ai_api._config``):
+
+    AI_RECORD_MODE=record | replay | replay-or-record   (default: off)
+    AI_RECORD_PATH=/path/to/recordings                  (default: ai/recordings)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms fall back to in-process locking.
+    fcntl = None  # type: ignore[assignment]
+
+__all__ = ["RecordingStore", "RECORD_MODES", "canonical_key", "get_store"]
+
+
+RECORD_MODES = ("off", "record", "replay", "replay-or-record")
+
+# Compact once the data file is this many times the size of its live entries.
+COMPACT_RATIO = 2
+COMPACT_MIN_BYTES = 1 << 20
+
+_STORES: Dict[str, "RecordingStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def canonical_key(path: Optional[str], payload: Dict[str, Any]) -> str:
+    """Hash a request independently of key order and of the injected project UUID."""
+    canonical = {key: value for key, value in payload.items() if key != "project_uuid"}
+    encoded = json.dumps({"path": path or "", "payload": canonical}, sort_keys=True,
+                         separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def get_store(directory: str) -> "RecordingStore":
+    """Return the shared store for ``directory`` (one instance per path per process)."""
+    directory = os.path.abspath(directory)
+    with _STORES_LOCK:
+        store = _STORES.get(directory)
+        if store is None:
+            store = _STORES[directory] = RecordingStore(directory)
+        return store
+
+
+class RecordingStore:
+    """Append-only data file plus a JSON index of ``key -> [offset, length]``."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.data_path = os.path.join(directory, "data.bin")
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock_path = os.path.join(directory, "store.lock")
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[int]] = {}
+        self._index_signature: Optional[tuple] = None
+
+    def __contains__(self, key: str) -> bool:
+        with self._locked(exclusive=False):
+            return key in self._index
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False):
+            return len(self._index)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._locked(exclusive=False):
+            entry = self._index.get(key)
+            blob = self._read_blob(entry) if entry is not None else None
+        if blob is None:
+            return None
+        try:
+            decoded = json.loads(zlib.decompress(blob).decode("utf-8"))
+        except (zlib.error, ValueError):
+            return None
+        return decoded if isinstance(decoded, dict) else None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        blob = zlib.compress(json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        with self._locked(exclusive=True):
+            entry = self._index.get(key)
+            if entry is not None and self._read_blob(entry) == blob:
+                return
+            with open(self.data_path, "ab") as handle:
+                handle.seek(0, os.SEEK_END)
+                offset = handle.tell()
+                handle.write(blob)
+            self._index[key] = [offset, len(blob)]
+            if offset + len(blob) >= COMPACT_MIN_BYTES and \
+                    offset + len(blob) > COMPACT_RATIO * sum(length for _, length in self._index.values()):
+                self._compact()
+            else:
+                self._write_index()
+
+    def compact(self) -> None:
+        """Rewrite the data file with only the blobs the index still points at."""
+        with self._locked(exclusive=True):
+            self._compact()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the in-process and cross-process locks, with the index freshly loaded."""
+        with self._lock:
+            if exclusive:
+                os.makedirs(self.directory, exist_ok=True)
+            if fcntl is None or not os.path.isdir(self.directory):
+                self._refresh_index(force=exclusive)
+                yield
+                return
+            with open(self.lock_path, "a+b") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    # Writers always re-read so they merge with entries from other processes.
+                    self._refresh_index(force=exclusive)
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh_index(self, force: bool = False) -> None:
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            self._index, self._index_signature = {}, None
+            return
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._index_signature and not force:
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as handle:
+                loaded = json.load(handle)
+        except (OSError, ValueError):
+            loaded = {}
+        self._index = loaded if isinstance(loaded, dict) else {}
+        self._index_signature = signature
+
+    def _read_blob(self, entry: List[int]) -> Optional[bytes]:
+        offset, length = entry
+        try:
+            with open(self.data_path, "rb") as handle:
+                handle.seek(offset)
+                blob = handle.read(length)
+        except OSError:
+            return None
+        return blob if len(blob) == length else None
+
+    def _compact(self) -> None:
+        tmp_path = f"{self.data_path}.tmp"
+        compacted: Dict[str, List[int]] = {}
+        with open(tmp_path, "wb") as handle:
+            for key, entry in self._index.items():
+                blob = self._read_blob(entry)
+                if blob is None:
+                    continue
+                compacted[key] = [handle.tell(), len(blob)]
+                handle.write(blob)
+        os.replace(tmp_path, self.data_path)
+        self._index = compacted
+        self._write_index()
+
+    def _write_index(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self._index, handle, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        stat = os.stat(self.index_path)
+        self._index_signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,138 @@
+"""
+EndpointRouter — latency-aware selection across several AI proxy base URLs.
+
+Each endpoint keeps an exponentially weighted moving average (EWMA) of call
+latency and error rate. Submissions go to the healthy endpoint with the lowest
+score ``latency * (1 + ERROR_PENALTY * error_rate) / weight``; endpoints that
+have not been called yet score zero so they get probed first, while endpoints
+that have only ever failed score last. An endpoint
+whose error rate climbs past ``unhealthy_threshold`` is skipped until
+``cooldown`` seconds after its last failure, then probed again, so failover and
+rebalancing happen live without a restart.
+
+The router only picks endpoints for submissions. Each proxy issues its own
+``ai_request_id`` values, so status polls must be sent to the endpoint that
+accepted the job; ``ai.local_ai_api`` reports it to the caller for that.
+
+Configure through the environment (read by ``ai.local_ai_api._config``):
+
+    AI_PROXY_BASE_URLS="https://eu.example.com=3, https://us.example.com=1"
+
+Weights are optional and default to 1. When unset, AI_PROXY_BASE_URL is used
+as the only endpoint.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["EndpointRouter", "parse_endpoints"]
+
+
+ERROR_PENALTY = 4.0
+
+
+def parse_endpoints(raw: str) -> List[Tuple[str, float]]:
+    """Parse ``"url[=weight], url[=weight]"`` into ``[(url, weight), ...]``."""
+    endpoints: List[Tuple[str, float]] = []
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, weight = item, 1.0
+        head, sep, tail = item.rpartition("=")
+        if sep:
+            try:
+                weight = float(tail)
+                url = head.strip()
+            except ValueError:
+                pass
+        if weight > 0:
+            endpoints.append((url.rstrip("/"), weight))
+    return endpoints
+
+
+class _EndpointStats:
+    __slots__ = ("url", "weight", "latency", "error_rate", "last_failure")
+
+    def __init__(self, url: str, weight: float) -> None:
+        self.url = url
+        self.weight = weight
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.last_failure = 0.0
+
+
+class EndpointRouter:
+    """Thread-safe EWMA bookkeeping and endpoint choice."""
+
+    def __init__(self, endpoints: Iterable[Tuple[str, float]], *, alpha: float = 0.3,
+                 unhealthy_threshold: float = 0.5, cooldown: float = 30.0) -> None:
+        self._endpoints: Dict[str, _EndpointStats] = {
+            url: _EndpointStats(url, weight) for url, weight in endpoints
+        }
+        if not self._endpoints:
+            raise ValueError("EndpointRouter needs at least one endpoint.")
+        self.alpha = alpha
+        self.unhealthy_threshold = unhealthy_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    def choose(self, exclude: Iterable[str] = ()) -> str:
+        """Return the best endpoint, preferring healthy ones not in ``exclude``."""
+        excluded = set(exclude)
+        now = time.monotonic()
+        with self._lock:
+            candidates = [stats for url, stats in self._endpoints.items() if url not in excluded]
+            if not candidates:
+                candidates = list(self._endpoints.values())
+            healthy = [stats for stats in candidates if self._is_healthy(stats, now)]
+            return min(healthy or candidates, key=self._score).url
+
+    def record(self, url: str, latency: float, ok: bool) -> None:
+        """Fold one call's outcome into the endpoint's moving averages."""
+        with self._lock:
+            stats = self._endpoints.get(url)
+            if stats is None:
+                return
+            stats.error_rate += self.alpha * ((0.0 if ok else 1.0) - stats.error_rate)
+            if not ok:
+                # Refused connections fail fast; keep them out of the latency average.
+                stats.last_failure = time.monotonic()
+            elif stats.latency is None:
+                stats.latency = latency
+            else:
+                stats.latency += self.alpha * (latency - stats.latency)
+
+    def snapshot(self) -> List[Dict[str, object]]:
+        """Current per-endpoint metrics, for logging and diagnostics."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": stats.url,
+                    "weight": stats.weight,
+                    "latency": stats.latency,
+                    "error_rate": stats.error_rate,
+                    "healthy": self._is_healthy(stats, now),
+                }
+                for stats in self._endpoints.values()
+            ]
+
+    def _is_healthy(self, stats: _EndpointStats, now: float) -> bool:
+        if stats.error_rate < self.unhealthy_threshold:
+            return True
+        return now - stats.last_failure >= self.cooldown
+
+    @staticmethod
+    def _score(stats: _EndpointStats) -> float:
+        if stats.latency is None:
+            # No successful call yet: untried endpoints go first, failing-only ones last.
+            return math.inf if stats.error_rate else 0.0
+        return stats.latency * (1 + ERROR_PENALTY * stats.error_rate) / stats.weight
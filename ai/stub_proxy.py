@@ -0,0 +1,213 @@
+"""
+StubAIProxy — local stand-in for the Flatlogic AI proxy used by benchmarks.
+
+Implements the two endpoints ``ai.local_ai_api`` talks to:
+
+    POST {prefix}/ai-request                  -> {"ai_request_id": 1, "status": "queued"}
+    GET  {prefix}/ai-request/<id>/status      -> {"status": "queued" | "success" | "failed", ...}
+
+Queue delay, per-call latency, error rates and response payload size are
+tunable so load tests can model a slow or flaky upstream without touching the
+network.
+
+Usage:
+
+    from ai.stub_proxy import StubAIProxy
+
+    with StubAIProxy(queue_delay=0.2, error_rate=0.05, payload_size=2048) as stub:
+        os.environ["AI_PROXY_BASE_URL"] = stub.base_url
+        ...
+
+Or standalone: ``python -m ai.stub_proxy --port 8765 --queue-delay 1``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+__all__ = ["StubAIProxy"]
+
+
+_STATUS_RE = re.compile(r"/ai-request/(?P<id>[^/]+)/status/?$")
+_SUBMIT_RE = re.compile(r"/ai-request/?$")
+
+
+class StubAIProxy:
+    """Threaded HTTP server emulating the AI proxy submit/status flow."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, queue_delay: float = 0.0,
+                 latency: float = 0.0, error_rate: float = 0.0, status_error_rate: float = 0.0,
+                 payload_size: int = 256, seed: Optional[int] = None) -> None:
+        self.queue_delay = queue_delay
+        self.latency = latency
+        self.error_rate = error_rate
+        self.status_error_rate = status_error_rate
+        self.payload_size = payload_size
+        self.stats: Dict[str, int] = {"submits": 0, "polls": 0, "errors": 0}
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._jobs: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubAIProxy":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubAIProxy":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _submit(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            self.stats["submits"] += 1
+        if self._roll(self.error_rate):
+            with self._lock:
+                self.stats["errors"] += 1
+            return 500, {"error": "stub_submit_error"}
+
+        ai_request_id = str(next(self._ids))
+        ready_at = time.monotonic() + self.queue_delay
+        with self._lock:
+            self._jobs[ai_request_id] = (ready_at, payload)
+        return 200, {"ai_request_id": ai_request_id, "status": "queued"}
+
+    def _status(self, ai_request_id: str) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            self.stats["polls"] += 1
+            job = self._jobs.get(ai_request_id)
+        if job is None:
+            return 404, {"error": "ai_request_not_found"}
+        if self._roll(self.status_error_rate):
+            with self._lock:
+                self.stats["errors"] += 1
+                self._jobs.pop(ai_request_id, None)
+            return 200, {"status": "failed", "error": "stub_status_error"}
+
+        ready_at, payload = job
+        if time.monotonic() < ready_at:
+            return 200, {"status": "queued"}
+
+        with self._lock:
+            self._jobs.pop(ai_request_id, None)
+        return 200, {"status": "success", "response": self._response_body(ai_request_id, payload)}
+
+    def _response_body(self, ai_request_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        text = ("lorem ipsum " * (self.payload_size // 12 + 1))[:self.payload_size]
+        wants_json = ((payload.get("text") or {}).get("format") or {}).get("type") == "json_object"
+        if wants_json:
+            text = json.dumps({"text": text[:max(self.payload_size - 12, 0)]})
+        return {
+            "id": f"resp_{ai_request_id}",
+            "status": "completed",
+            "model": payload.get("model"),
+            "output": [
+                {"type": "reasoning", "summary": []},
+                {"type": "message", "content": [{"type": "output_text", "text": text}]},
+            ],
+            "usage": {"input_tokens": len(json.dumps(payload.get("input"))) // 4,
+                      "output_tokens": len(text) // 4},
+        }
+
+    def _handler_class(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:  # noqa: N802
+                if not _SUBMIT_RE.search(self.path):
+                    self._reply(404, {"error": "not_found"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    payload = json.loads(raw.decode("utf-8")) if raw else {}
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    self._reply(400, {"error": "invalid_json"})
+                    return
+                self._reply(*stub._submit(payload if isinstance(payload, dict) else {}))
+
+            def do_GET(self) -> None:  # noqa: N802
+                match = _STATUS_RE.search(self.path.split("?", 1)[0])
+                if not match:
+                    self._reply(404, {"error": "not_found"})
+                    return
+                self._reply(*stub._status(match.group("id")))
+
+            def _reply(self, status: int, body: Dict[str, Any]) -> None:
+                if stub.latency > 0:
+                    time.sleep(stub.latency)
+                encoded = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                return
+
+        return Handler
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local stub of the Flatlogic AI proxy.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue-delay", type=float, default=0.0, help="Seconds before a job completes.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of submits that fail.")
+    parser.add_argument("--status-error-rate", type=float, default=0.0, help="Fraction of polls that fail.")
+    parser.add_argument("--payload-size", type=int, default=256, help="Characters of output text.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    stub = StubAIProxy(args.host, args.port, queue_delay=args.queue_delay, latency=args.latency,
+                       error_rate=args.error_rate, status_error_rate=args.status_error_rate,
+                       payload_size=args.payload_size, seed=args.seed)
+    print(f"Stub AI proxy listening on {stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
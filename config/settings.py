@@ -54,8 +54,9 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    # core precedes staticfiles so its content-hashing collectstatic overrides the stock command.
     'core',
+    'django.contrib.staticfiles',
 ]
 
 MIDDLEWARE = [
@@ -149,11 +150,18 @@ STATIC_URL = 'static/'
 # Collect static into a separate folder; avoid overlapping with STATICFILES_DIRS.
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Vendor assets are not served straight from node_modules: `manage.py build_static`
+# copies and bundles only what STATIC_MANIFEST declares into STATIC_BUILD_DIR.
+STATIC_MANIFEST = BASE_DIR / 'static_manifest.json'
+STATIC_BUILD_DIR = BASE_DIR / 'build' / 'static'
+
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
     BASE_DIR / 'assets',
-    BASE_DIR / 'node_modules',
 ]
+# The build dir only exists after the first `manage.py build_static`.
+if STATIC_BUILD_DIR.is_dir():
+    STATICFILES_DIRS.append(STATIC_BUILD_DIR)
 
 # Email
 EMAIL_BACKEND = os.getenv(
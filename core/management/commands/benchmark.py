@@ -0,0 +1,265 @@
+"""
+Benchmark and load-test suite backed by the local stub AI proxy.
+
+    python3 manage.py benchmark                       # run, write bench_results.json
+    python3 manage.py benchmark --save-baseline       # also store as bench_baseline.json
+    python3 manage.py benchmark --fail-on-regression  # non-zero exit when slower than baseline
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from ai import local_ai_api
+from ai.stub_proxy import StubAIProxy
+
+# Environment used to point ai.local_ai_api at the stub for the duration of a run.
+STUB_ENV = {
+    "PROJECT_ID": "bench",
+    "PROJECT_UUID": "00000000-0000-0000-0000-000000000000",
+    "AI_TIMEOUT": "10",
+    # Never replay from, or write into, the developer's recordings store.
+    "AI_RECORD_MODE": "off",
+}
+
+
+def _summarise(samples: List[float], errors: int = 0) -> Dict[str, Any]:
+    """Reduce raw durations (seconds) to the metrics stored in the results file."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "errors": errors}
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(0.50) * 1000,
+        "p95_ms": pct(0.95) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _time_calls(func: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    func()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return _summarise(samples)
+
+
+def _load(func: Callable[[], bool], concurrency: int, total: int) -> Dict[str, Any]:
+    """Run ``func`` ``total`` times across ``concurrency`` threads; func returns success."""
+    samples: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = func()
+        except Exception:  # pylint: disable=broad-except
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples.append(elapsed)
+            if not ok:
+                errors += 1
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - wall_started
+
+    result = _summarise(samples, errors)
+    result["concurrency"] = concurrency
+    result["throughput_rps"] = total / wall if wall else 0.0
+    return result
+
+
+def _sample_response(payload_size: int) -> Dict[str, Any]:
+    text = json.dumps({"summary": ("lorem ipsum " * (payload_size // 12 + 1))[:payload_size]})
+    return {
+        "success": True,
+        "status": 200,
+        "data": {
+            "id": "resp_bench",
+            "status": "completed",
+            "output": [
+                {"type": "reasoning", "summary": []},
+                {"type": "message", "content": [{"type": "output_text", "text": f"```json\n{text}\n```"}]},
+            ],
+        },
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Return one entry per metric whose p50 regressed by more than ``threshold`` percent."""
+    regressions = []
+    for section in ("micro", "load"):
+        current_section = results.get(section) or {}
+        baseline_section = baseline.get(section) or {}
+        for name, current in current_section.items():
+            previous = baseline_section.get(name)
+            if not isinstance(previous, dict):
+                continue
+            before, after = previous.get("p50_ms"), current.get("p50_ms")
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            current["p50_change_pct"] = round(change, 2)
+            if change > threshold:
+                regressions.append({"name": f"{section}.{name}", "baseline_p50_ms": before,
+                                    "p50_ms": after, "change_pct": round(change, 2)})
+    return regressions
+
+
+class Command(BaseCommand):
+    help = "Run micro-benchmarks and load tests against a local stub AI proxy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200,
+                            help="Iterations per micro-benchmark.")
+        parser.add_argument("--concurrency", default="1,4,16",
+                            help="Comma-separated concurrency levels for load tests.")
+        parser.add_argument("--requests", type=int, default=100,
+                            help="Requests per concurrency level.")
+        parser.add_argument("--queue-delay", type=float, default=0.0)
+        parser.add_argument("--latency", type=float, default=0.0)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--payload-size", type=int, default=2048)
+        parser.add_argument("--output", default=str(settings.BASE_DIR / "bench_results.json"))
+        parser.add_argument("--baseline", default=str(settings.BASE_DIR / "bench_baseline.json"))
+        parser.add_argument("--save-baseline", action="store_true",
+                            help="Store this run as the new baseline.")
+        parser.add_argument("--threshold", type=float, default=10.0,
+                            help="Allowed p50 slowdown versus baseline, in percent.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",") if level.strip()]
+        except ValueError as exc:
+            raise CommandError(f"Invalid --concurrency value: {options['concurrency']}") from exc
+        if not levels or any(level <= 0 for level in levels):
+            raise CommandError("--concurrency levels must be positive integers.")
+        for name in ("iterations", "requests"):
+            if options[name] <= 0:
+                raise CommandError(f"--{name} must be a positive integer.")
+
+        stub = StubAIProxy(queue_delay=options["queue_delay"], latency=options["latency"],
+                           error_rate=options["error_rate"], payload_size=options["payload_size"], seed=0)
+        stub_env = {**STUB_ENV, "AI_PROXY_BASE_URL": stub.base_url, "AI_PROXY_BASE_URLS": stub.base_url}
+        saved_env = {key: os.environ.get(key) for key in stub_env}
+        saved_cache = local_ai_api._CONFIG_CACHE
+
+        with stub:
+            os.environ.update(stub_env)
+            local_ai_api._CONFIG_CACHE = None
+            try:
+                results = {
+                    "meta": {
+                        "timestamp": int(time.time()),
+                        "python_version": platform.python_version(),
+                        "iterations": options["iterations"],
+                        "requests": options["requests"],
+                        "stub": {
+                            "queue_delay": options["queue_delay"],
+                            "latency": options["latency"],
+                            "error_rate": options["error_rate"],
+                            "payload_size": options["payload_size"],
+                        },
+                    },
+                    "micro": self._micro(stub, options),
+                    "load": self._load_tests(levels, options["requests"]),
+                }
+            finally:
+                for key, value in saved_env.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+                local_ai_api._CONFIG_CACHE = saved_cache
+
+        regressions: List[Dict[str, Any]] = []
+        baseline_path = Path(options["baseline"])
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+            regressions = compare(results, baseline, options["threshold"])
+            results["regressions"] = regressions
+
+        Path(options["output"]).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        if options["save_baseline"]:
+            baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+        self._report(results)
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed beyond {options['threshold']}%.")
+
+    def _micro(self, stub: StubAIProxy, options: Dict[str, Any]) -> Dict[str, Any]:
+        iterations = options["iterations"]
+        sample = _sample_response(options["payload_size"])
+        submit_url = f"{stub.base_url}/projects/bench/ai-request"
+        body = json.dumps({"input": [{"role": "user", "content": "ping"}]}).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+
+        return {
+            "_http_request": _time_calls(
+                lambda: local_ai_api._http_request(submit_url, "POST", body, headers, 10, True), iterations),
+            "_extract_text": _time_calls(lambda: local_ai_api._extract_text(sample), iterations * 10),
+            "decode_json_from_response": _time_calls(
+                lambda: local_ai_api.decode_json_from_response(sample), iterations * 10),
+        }
+
+    def _load_tests(self, levels: List[int], total: int) -> Dict[str, Any]:
+        local = threading.local()
+
+        def home() -> bool:
+            if not hasattr(local, "client"):
+                local.client = Client()
+            return local.client.get("/", HTTP_HOST="localhost").status_code == 200
+
+        def ai_create_response() -> bool:
+            response = local_ai_api.create_response(
+                {"input": [{"role": "user", "content": "Summarise this text."}],
+                 "text": {"format": {"type": "json_object"}}},
+                {"poll_interval": 1},
+            )
+            return bool(response.get("success"))
+
+        results: Dict[str, Any] = {}
+        for name, func in (("home", home), ("ai_create_response", ai_create_response)):
+            for level in levels:
+                results[f"{name}@{level}"] = _load(func, level, total)
+        return results
+
+    def _report(self, results: Dict[str, Any]) -> None:
+        for section in ("micro", "load"):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{section}:"))
+            for name, metrics in results[section].items():
+                line = f"  {name:<32} p50 {metrics['p50_ms']:9.3f} ms  p95 {metrics['p95_ms']:9.3f} ms"
+                if "throughput_rps" in metrics:
+                    line += f"  {metrics['throughput_rps']:8.1f} req/s  errors {metrics['errors']}"
+                if "p50_change_pct" in metrics:
+                    line += f"  ({metrics['p50_change_pct']:+.1f}% vs baseline)"
+                self.stdout.write(line)
+        for regression in results.get("regressions", []):
+            self.stdout.write(self.style.WARNING(
+                f"Regression: {regression['name']} {regression['change_pct']:+.1f}% p50"))
@@ -0,0 +1,127 @@
+"""
+Build the lean static tree declared in the static manifest.
+
+    python3 manage.py build_static
+    python3 manage.py collectstatic --noinput
+
+Only files listed in the manifest are copied out of node_modules; CSS bundles
+are concatenated, minified and written under a content-hashed name, and the
+critical subset of each bundle is saved for inlining by ``{% critical_css %}``.
+Unchanged outputs are left untouched so collectstatic can skip them.
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.static_build import (
+    build_manifest_path,
+    collect_template_tokens,
+    critical_css_path,
+    extract_critical_css,
+    load_manifest,
+    minify_css,
+    resolve_source,
+    write_if_changed,
+)
+
+
+class Command(BaseCommand):
+    help = "Bundle, minify and collect the static assets declared in the static manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--manifest", default=None,
+                            help="Path to the static manifest (defaults to settings.STATIC_MANIFEST).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            manifest = load_manifest(options["manifest"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read static manifest: {exc}") from exc
+
+        build_dir = Path(settings.STATIC_BUILD_DIR)
+        sources = manifest["sources"]
+        previous = self._previous_build()
+        result = {"bundles": {}, "files": []}
+        written = unchanged = 0
+
+        for relative in manifest["files"]:
+            source = self._resolve(relative, sources)
+            if write_if_changed(build_dir / relative, source.read_bytes()):
+                written += 1
+            else:
+                unchanged += 1
+            result["files"].append(relative)
+
+        for stale in set(previous.get("files", [])) - set(result["files"]):
+            (build_dir / stale).unlink(missing_ok=True)
+
+        bundles_css = {}
+        for name, parts in manifest["bundles"].items():
+            if not name.endswith(".css"):
+                raise CommandError(f"Only CSS bundles are supported, got {name!r}.")
+            raw = "\n".join(self._resolve(part, sources).read_text(encoding="utf-8") for part in parts)
+            minified = minify_css(raw)
+            bundles_css[name] = minified
+
+            data = minified.encode("utf-8")
+            stem = name[:-len(".css")]
+            output = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.css"
+            if write_if_changed(build_dir / output, data):
+                written += 1
+            else:
+                unchanged += 1
+            self._prune_bundles(build_dir, stem, output)
+            result["bundles"][name] = output
+            self.stdout.write(f"{name} -> {output}: {len(raw.encode('utf-8')):,} -> {len(data):,} bytes")
+
+        for name, stale in previous.get("bundles", {}).items():
+            if name not in result["bundles"]:
+                (build_dir / stale).unlink(missing_ok=True)
+
+        critical = manifest["critical"]
+        if critical.get("bundle"):
+            if critical["bundle"] not in bundles_css:
+                raise CommandError(f"Critical CSS bundle {critical['bundle']!r} is not declared in bundles.")
+            tokens = collect_template_tokens(critical.get("templates", []))
+            critical_css = extract_critical_css(bundles_css[critical["bundle"]], tokens)
+            write_if_changed(critical_css_path(), critical_css.encode("utf-8"))
+            result["critical"] = critical["bundle"]
+            self.stdout.write(f"critical CSS: {len(critical_css.encode('utf-8')):,} bytes")
+        else:
+            critical_css_path().unlink(missing_ok=True)
+
+        write_if_changed(build_manifest_path(), json.dumps(result, indent=2).encode("utf-8"))
+
+        total_size = sum(path.stat().st_size for path in build_dir.rglob("*") if path.is_file())
+        self.stdout.write(self.style.SUCCESS(
+            f"Static build finished in {time.perf_counter() - started:.2f}s: "
+            f"{written} written, {unchanged} unchanged, {total_size:,} bytes in {build_dir}."
+        ))
+
+    def _resolve(self, relative, sources):
+        source = resolve_source(relative, sources)
+        if source is None:
+            raise CommandError(f"{relative!r} not found in any of {', '.join(sources)}. Did you run npm install?")
+        return source
+
+    def _previous_build(self):
+        try:
+            return json.loads(build_manifest_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _prune_bundles(self, build_dir, stem, keep):
+        pattern = re.compile(rf"{re.escape(Path(stem).name)}\.[0-9a-f]{{12}}\.css$")
+        directory = (build_dir / stem).parent
+        if not directory.is_dir():
+            return
+        for path in directory.iterdir():
+            if pattern.match(path.name) and path != build_dir / keep:
+                path.unlink()
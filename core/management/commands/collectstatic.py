@@ -0,0 +1,59 @@
+"""
+collectstatic that skips files whose content is unchanged.
+
+Django's own command compares modification times, so every fresh checkout or
+rebuilt node_modules copies the whole tree again. Comparing SHA-256 digests
+keeps repeated deploys incremental. ``core`` is listed before
+``django.contrib.staticfiles`` in INSTALLED_APPS so this command takes over.
+"""
+
+import os
+import time
+
+from django.contrib.staticfiles.management.commands import collectstatic
+
+from core.static_build import file_digest
+
+
+class Command(collectstatic.Command):
+
+    def handle(self, **options):
+        started = time.perf_counter()
+        summary = super().handle(**options)
+        if self.verbosity >= 1 and self.is_local_storage():
+            root = self.storage.path("")
+            total_size = sum(
+                os.path.getsize(os.path.join(directory, name))
+                for directory, _, names in os.walk(root)
+                for name in names
+            )
+            self.stdout.write(f"Collected in {time.perf_counter() - started:.2f}s; {root} holds {total_size:,} bytes.")
+        return summary
+
+    def delete_file(self, path, prefixed_path, source_storage):
+        if not (self.local and self.storage.exists(prefixed_path)):
+            return super().delete_file(path, prefixed_path, source_storage)
+
+        full_path = self.storage.path(prefixed_path)
+        if self.symlink or os.path.islink(full_path):
+            return super().delete_file(path, prefixed_path, source_storage)
+
+        try:
+            source_path = source_storage.path(path)
+            unchanged = (os.path.getsize(source_path) == os.path.getsize(full_path)
+                         and file_digest(source_path) == file_digest(full_path))
+        except (OSError, NotImplementedError):
+            return super().delete_file(path, prefixed_path, source_storage)
+
+        if unchanged:
+            if prefixed_path not in self.unmodified_files:
+                self.unmodified_files.append(prefixed_path)
+            self.log("Skipping '%s' (unchanged content)" % path)
+            return False
+
+        if self.dry_run:
+            self.log("Pretending to delete '%s'" % path)
+        else:
+            self.log("Deleting '%s'" % path)
+            self.storage.delete(prefixed_path)
+        return True
@@ -0,0 +1,246 @@
+"""
+Static build helpers: manifest loading, CSS bundling/minification and critical CSS.
+
+The source manifest (settings.STATIC_MANIFEST) declares which files the
+templates actually need:
+
+    {
+      "sources": ["node_modules", "static"],        # lookup roots, relative to BASE_DIR
+      "bundles": {"app.css": ["bootstrap/dist/css/bootstrap.css", "css/custom.css"]},
+      "files": [],                                   # extra assets copied as-is
+      "critical": {"bundle": "app.css", "templates": ["core/templates"]}
+    }
+
+`manage.py build_static` writes the results to settings.STATIC_BUILD_DIR, which
+is the only place vendor assets enter STATICFILES_DIRS.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+BUILD_MANIFEST_NAME = "build-manifest.json"
+CRITICAL_CSS_NAME = "critical.css"
+
+_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*[\s\S]*?\*/')
+_SPACE_RE = re.compile(r"\s+")
+_AROUND_RE = re.compile(r"\s*([{};,>~])\s*")
+_AFTER_COLON_RE = re.compile(r":\s+")
+# `--x: ;` is an intentionally empty custom property; engines reject `--x:;`.
+_EMPTY_CUSTOM_PROPERTY_RE = re.compile(r"(--[\w-]+):(?=[;}])")
+
+# At-rules whose blocks never hold above-the-fold styles.
+_SKIPPED_AT_RULES = ("@font-face", "@keyframes", "@-webkit-keyframes", "@page", "@property")
+_NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+
+def load_manifest(path=None):
+    path = Path(path or settings.STATIC_MANIFEST)
+    with open(path, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    manifest.setdefault("sources", ["static"])
+    manifest.setdefault("bundles", {})
+    manifest.setdefault("files", [])
+    manifest.setdefault("critical", {})
+    return manifest
+
+
+# Build metadata lives next to, not inside, the static build dir so collectstatic
+# never publishes it.
+def build_manifest_path():
+    return Path(settings.STATIC_BUILD_DIR).parent / BUILD_MANIFEST_NAME
+
+
+def critical_css_path():
+    return Path(settings.STATIC_BUILD_DIR).parent / CRITICAL_CSS_NAME
+
+
+def resolve_source(relative_path, sources):
+    """Find ``relative_path`` under the first manifest source root that has it."""
+    for root in sources:
+        candidate = Path(settings.BASE_DIR) / root / relative_path
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def file_digest(path):
+    with open(path, "rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def write_if_changed(path, data):
+    """Write bytes to ``path`` unless it already holds them; returns True on write."""
+    path = Path(path)
+    if path.is_file() and path.stat().st_size == len(data):
+        if file_digest(path) == hashlib.sha256(data).hexdigest():
+            return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace, leaving strings and /*! licences intact."""
+    out, pending = [], []
+    position = 0
+    after_licence = False
+    for match in _TOKEN_RE.finditer(css):
+        token = match.group(0)
+        pending.append(css[position:match.start()])
+        position = match.end()
+        if token.startswith("/*") and not token.startswith("/*!"):
+            # A dropped comment still separates tokens, as in `a/**/b`.
+            pending.append(" ")
+            continue
+        chunk = _minify_chunk("".join(pending))
+        pending = []
+        if after_licence:
+            chunk = chunk.lstrip()
+        if token.startswith("/*!"):
+            out.extend([chunk.rstrip(), token, "\n"])
+        else:
+            out.extend([chunk, token])
+        after_licence = token.startswith("/*!")
+    pending.append(css[position:])
+    chunk = _minify_chunk("".join(pending))
+    out.append(chunk.lstrip() if after_licence else chunk)
+    return "".join(out).strip()
+
+
+def _minify_chunk(chunk):
+    chunk = _SPACE_RE.sub(" ", chunk)
+    chunk = _AROUND_RE.sub(r"\1", chunk)
+    chunk = _AFTER_COLON_RE.sub(":", chunk).replace(";}", "}")
+    return _EMPTY_CUSTOM_PROPERTY_RE.sub(r"\1: ", chunk)
+
+
+def collect_template_tokens(directories):
+    """Gather tag names, classes and ids that appear in the given template trees."""
+    tags, classes, ids = {"html", "body", "head"}, set(), set()
+    for directory in directories:
+        for path in sorted((Path(settings.BASE_DIR) / directory).rglob("*.html")):
+            source = path.read_text(encoding="utf-8")
+            source = re.sub(r"{%.*?%}|{{.*?}}", " ", source, flags=re.S)
+            tags.update(name.lower() for name in re.findall(r"<([a-zA-Z][\w-]*)", source))
+            for value in re.findall(r'\bclass\s*=\s*["\']([^"\']*)["\']', source):
+                classes.update(value.split())
+            ids.update(re.findall(r'\bid\s*=\s*["\']([^"\']+)["\']', source))
+    return tags, classes, ids
+
+
+def extract_critical_css(css, tokens):
+    """Keep only the rules of minified ``css`` whose selectors can match the templates."""
+    css = _TOKEN_RE.sub(lambda match: "" if match.group(0).startswith("/*") else match.group(0), css)
+    return "".join(_critical_rules(css, tokens))
+
+
+def _critical_rules(css, tokens):
+    position, length = 0, len(css)
+    while position < length:
+        brace = _find_outside_strings(css, "{", position)
+        semicolon = _find_outside_strings(css, ";", position)
+        if brace == -1:
+            break
+        if semicolon != -1 and semicolon < brace:
+            # Statement at-rule such as @charset or @import.
+            position = semicolon + 1
+            continue
+        prelude = css[position:brace].strip()
+        end = _matching_brace(css, brace)
+        body = css[brace + 1:end]
+        position = end + 1
+
+        if prelude.startswith(_SKIPPED_AT_RULES):
+            continue
+        if prelude.startswith(_NESTED_AT_RULES):
+            inner = "".join(_critical_rules(body, tokens))
+            if inner:
+                yield f"{prelude}{{{inner}}}"
+            continue
+        if prelude.startswith("@"):
+            continue
+        selectors = [selector for selector in _split_selectors(prelude) if _selector_matches(selector, tokens)]
+        if selectors:
+            yield f"{','.join(selectors)}{{{body}}}"
+
+
+def _find_outside_strings(css, char, start):
+    quote = None
+    index = start
+    while index < len(css):
+        current = css[index]
+        if quote:
+            if current == "\\":
+                index += 1
+            elif current == quote:
+                quote = None
+        elif current in "\"'":
+            quote = current
+        elif current == char:
+            return index
+        index += 1
+    return -1
+
+
+def _matching_brace(css, open_index):
+    depth, quote, index = 0, None, open_index
+    while index < len(css):
+        current = css[index]
+        if quote:
+            if current == "\\":
+                index += 1
+            elif current == quote:
+                quote = None
+        elif current in "\"'":
+            quote = current
+        elif current == "{":
+            depth += 1
+        elif current == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+        index += 1
+    return len(css) - 1
+
+
+def _split_selectors(prelude):
+    selectors, depth, current = [], 0, []
+    for char in prelude:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        if char == "," and depth == 0:
+            selectors.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    selectors.append("".join(current).strip())
+    return [selector for selector in selectors if selector]
+
+
+def _selector_matches(selector, tokens):
+    tags, classes, ids = tokens
+    simplified = selector
+    while True:
+        # Arguments of :not(), :is(), :where() etc. never make a selector required.
+        reduced = re.sub(r"\([^()]*\)", "", simplified)
+        if reduced == simplified:
+            break
+        simplified = reduced
+    simplified = re.sub(r"\[[^\]]*\]", "", simplified)
+    simplified = re.sub(r"::?[\w-]+", "", simplified)
+
+    if not set(re.findall(r"\.(-?[_a-zA-Z][\w-]*)", simplified)) <= classes:
+        return False
+    if not set(re.findall(r"#(-?[_a-zA-Z][\w-]*)", simplified)) <= ids:
+        return False
+    selector_tags = re.findall(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)", simplified)
+    return {tag.lower() for tag in selector_tags} <= tags
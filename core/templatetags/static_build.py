@@ -0,0 +1,63 @@
+import json
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from core.static_build import build_manifest_path, critical_css_path, load_manifest
+
+register = template.Library()
+
+# Build outputs only change on deploy; cache them per file modification time.
+_CACHE = {}
+
+
+def _read_cached(path, parse):
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    cached = _CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _CACHE[path] = (mtime, parse(path.read_text(encoding="utf-8")))
+    return cached[1]
+
+
+@register.simple_tag
+def critical_css():
+    """Inline the critical CSS written by ``manage.py build_static``, if any."""
+    css = _read_cached(critical_css_path(), lambda text: text)
+    if not css:
+        return ""
+    return format_html("<style>{}</style>", mark_safe(css.replace("</", "<\\/")))
+
+
+@register.simple_tag(takes_context=True)
+def css_bundle(context, name):
+    """
+    Link a built CSS bundle by its hashed name.
+
+    With critical CSS inlined the bundle is loaded without blocking render.
+    Before the first build, links whichever bundle sources the static finders
+    can serve, cache-busted with the deployment timestamp.
+    """
+    build = _read_cached(build_manifest_path(), json.loads) or {}
+    output = build.get("bundles", {}).get(name)
+    if output:
+        href = static(output)
+        if build.get("critical") == name and _read_cached(critical_css_path(), lambda text: text):
+            return format_html(
+                '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+                '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+                href,
+            )
+        return format_html('<link rel="stylesheet" href="{}">', href)
+
+    parts = load_manifest().get("bundles", {}).get(name, [])
+    version = context.get("deployment_timestamp", "")
+    return format_html_join(
+        "\n", '<link rel="stylesheet" href="{}?v={}">',
+        ((static(part), version) for part in parts if finders.find(part)),
+    )
@@ -1,3 +1,453 @@
-from django.test import TestCase
+import io
+import itertools
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from ai import local_ai_api
+from ai.recorder import RecordingStore, canonical_key
+from ai.router import EndpointRouter, parse_endpoints
+from ai.stub_proxy import StubAIProxy
+from core.management.commands.benchmark import _summarise, compare
+from core.static_build import extract_critical_css, minify_css
+
+PAYLOAD = {"input": [{"role": "user", "content": "Summarise this text."}]}
+
+
+class StubProxyMixin:
+    """Point ai.local_ai_api at a fresh StubAIProxy with an isolated environment."""
+
+    stub_options = {}
+
+    def setUp(self):
+        super().setUp()
+        self.stub = StubAIProxy(**self.stub_options).start()
+        self.addCleanup(self.stub.stop)
+        self.record_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.record_dir, ignore_errors=True)
+        self.set_env(AI_PROXY_BASE_URLS=self.stub.base_url)
+
+    def set_env(self, **env):
+        env = {
+            "PROJECT_ID": "test",
+            "PROJECT_UUID": "00000000-0000-0000-0000-000000000000",
+            "AI_PROXY_BASE_URL": self.stub.base_url,
+            "AI_RECORD_MODE": "off",
+            "AI_RECORD_PATH": self.record_dir,
+            "AI_TIMEOUT": "5",
+            **env,
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        local_ai_api._CONFIG_CACHE = None
+        self.addCleanup(setattr, local_ai_api, "_CONFIG_CACHE", None)
+
+
+class StubAIProxyTests(StubProxyMixin, TestCase):
+
+    def test_queue_delay_keeps_job_queued_until_ready(self):
+        self.stub.queue_delay = 0.3
+        ai_request_id = local_ai_api.request(None, dict(PAYLOAD))["data"]["ai_request_id"]
+        self.assertEqual(local_ai_api.fetch_status(ai_request_id)["data"]["status"], "queued")
+        with mock.patch("ai.stub_proxy.time.monotonic", return_value=10 ** 9):
+            self.assertEqual(local_ai_api.fetch_status(ai_request_id)["data"]["status"], "success")
+
+    def test_error_rate_fails_submits(self):
+        self.stub.error_rate = 1.0
+        response = local_ai_api.request(None, dict(PAYLOAD))
+        self.assertEqual(response["status"], 500)
+        self.assertEqual(self.stub.stats, {"submits": 1, "polls": 0, "errors": 1})
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.output = os.path.join(self.directory, "results.json")
+        self.baseline = os.path.join(self.directory, "baseline.json")
+
+    def run_benchmark(self, **options):
+        options = {"iterations": 1, "requests": 1, "concurrency": "1",
+                   "output": self.output, "baseline": self.baseline, **options}
+        call_command("benchmark", stdout=io.StringIO(), **options)
+        with open(self.output, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def test_tiny_run_saves_baseline_and_flags_regressions(self):
+        results = self.run_benchmark(save_baseline=True)
+        self.assertEqual(set(results["micro"]), {"_http_request", "_extract_text", "decode_json_from_response"})
+        self.assertEqual(set(results["load"]), {"home@1", "ai_create_response@1"})
+        for metrics in results["load"].values():
+            self.assertEqual((metrics["count"], metrics["errors"]), (1, 0))
+        self.assertTrue(os.path.exists(self.baseline))
+
+        # Any positive p50 is a slowdown beyond -100%.
+        with self.assertRaisesMessage(CommandError, "regressed"):
+            self.run_benchmark(threshold=-100, fail_on_regression=True)
+        with open(self.output, encoding="utf-8") as handle:
+            self.assertTrue(json.load(handle)["regressions"])
+
+    def test_rejects_non_positive_counts(self):
+        for options in ({"requests": 0}, {"iterations": -1}, {"concurrency": "1,0"}, {"concurrency": "x"}):
+            with self.assertRaises(CommandError, msg=options):
+                self.run_benchmark(**options)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_compare_reports_only_changes_beyond_threshold(self):
+        baseline = {"micro": {"fast": {"p50_ms": 10.0}, "slow": {"p50_ms": 10.0}},
+                    "load": {"gone": {"p50_ms": 1.0}}}
+        results = {"micro": {"fast": {"p50_ms": 10.9}, "slow": {"p50_ms": 11.1}, "new": {"p50_ms": 1.0}},
+                   "load": {}}
+
+        regressions = compare(results, baseline, threshold=10)
+        self.assertEqual([regression["name"] for regression in regressions], ["micro.slow"])
+        self.assertAlmostEqual(regressions[0]["change_pct"], 11.0)
+        self.assertAlmostEqual(results["micro"]["fast"]["p50_change_pct"], 9.0)
+        self.assertNotIn("p50_change_pct", results["micro"]["new"])
+
+    def test_summarise_percentiles(self):
+        summary = _summarise([index / 1000 for index in range(100, 0, -1)], errors=2)
+        self.assertEqual((summary["count"], summary["errors"]), (100, 2))
+        self.assertAlmostEqual(summary["p50_ms"], 51.0)
+        self.assertAlmostEqual(summary["p95_ms"], 95.0)
+        self.assertAlmostEqual(summary["max_ms"], 100.0)
+        self.assertAlmostEqual(summary["mean_ms"], 50.5)
+        self.assertEqual(_summarise([], errors=1), {"count": 0, "errors": 1})
+
+
+class RecordingStoreTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_canonical_key_ignores_key_order_and_project_uuid(self):
+        first = canonical_key(None, {"model": "m", "input": [1], "project_uuid": "a"})
+        second = canonical_key(None, {"input": [1], "model": "m", "project_uuid": "b"})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, canonical_key("/other", {"model": "m", "input": [1]}))
+        self.assertNotEqual(first, canonical_key(None, {"model": "m", "input": [2]}))
+
+    def test_stores_sharing_a_directory_keep_each_others_entries(self):
+        first, second = RecordingStore(self.directory), RecordingStore(self.directory)
+        first.put("k1", {"value": 1})
+        second.put("k2", {"value": 2})
+
+        self.assertEqual(first.get("k2"), {"value": 2})
+        self.assertEqual(second.get("k1"), {"value": 1})
+        self.assertEqual(len(RecordingStore(self.directory)), 2)
+
+    def test_identical_rerecording_does_not_grow_data_file(self):
+        store = RecordingStore(self.directory)
+        store.put("k1", {"value": 1})
+        size = os.path.getsize(store.data_path)
+        store.put("k1", {"value": 1})
+        self.assertEqual(os.path.getsize(store.data_path), size)
+
+    def test_compaction_drops_superseded_blobs(self):
+        store = RecordingStore(self.directory)
+        with mock.patch("ai.recorder.COMPACT_MIN_BYTES", 0):
+            for value in range(10):
+                store.put("k1", {"value": value})
+            store.put("k2", {"value": "other"})
+        self.assertEqual(store.get("k1"), {"value": 9})
+        self.assertEqual(store.get("k2"), {"value": "other"})
+        live = sum(length for _, length in store._index.values())
+        self.assertLessEqual(os.path.getsize(store.data_path), 2 * live)
+
+
+class RecordReplayTests(StubProxyMixin, TestCase):
+
+    def test_replay_miss_never_reaches_the_proxy(self):
+        response = local_ai_api.create_response(PAYLOAD, {"record_mode": "replay"})
+        self.assertEqual(response["error"], "replay_miss")
+        self.assertEqual(self.stub.stats["submits"], 0)
+
+    def test_recorded_response_is_replayed_without_network(self):
+        recorded = local_ai_api.create_response(PAYLOAD, {"record_mode": "record"})
+        self.assertTrue(recorded["success"])
+
+        replayed = local_ai_api.create_response(dict(PAYLOAD), {"record_mode": "replay"})
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(self.stub.stats["submits"], 1)
+
+    def test_replay_or_record_records_only_on_miss(self):
+        for _ in range(3):
+            response = local_ai_api.create_response(PAYLOAD, {"record_mode": "replay-or-record"})
+            self.assertTrue(response["success"])
+        self.assertEqual(self.stub.stats["submits"], 1)
+
+    def test_record_mode_option_is_case_insensitive(self):
+        response = local_ai_api.create_response(PAYLOAD, {"record_mode": "Replay"})
+        self.assertEqual(response["error"], "replay_miss")
+
+    def test_unknown_record_mode_is_rejected(self):
+        response = local_ai_api.create_response(PAYLOAD, {"record_mode": "sometimes"})
+        self.assertEqual(response["error"], "record_mode_invalid")
+
+
+class EndpointRouterTests(TestCase):
+
+    def test_parse_endpoints_reads_optional_weights(self):
+        self.assertEqual(
+            parse_endpoints(" https://a.example/=3, https://b.example ,,http://c.example:8080=0.5"),
+            [("https://a.example", 3.0), ("https://b.example", 1.0), ("http://c.example:8080", 0.5)],
+        )
+        self.assertEqual(parse_endpoints("https://a.example=0"), [])
+
+    def test_latency_ewma_prefers_faster_endpoint(self):
+        router = EndpointRouter([("a", 1), ("b", 1)], alpha=0.5)
+        router.record("a", 0.2, True)
+        router.record("b", 0.1, True)
+        self.assertEqual(router.choose(), "b")
+        router.record("b", 0.5, True)
+        self.assertAlmostEqual(router.snapshot()[1]["latency"], 0.3)
+        self.assertEqual(router.choose(), "a")
+
+    def test_weight_scales_score(self):
+        router = EndpointRouter([("a", 4), ("b", 1)])
+        router.record("a", 0.3, True)
+        router.record("b", 0.1, True)
+        self.assertEqual(router.choose(), "a")
+
+    def test_unhealthy_endpoint_is_skipped_until_cooldown(self):
+        router = EndpointRouter([("a", 1), ("b", 1)], alpha=1.0, cooldown=30)
+        router.record("a", 0.01, True)
+        router.record("b", 0.5, True)
+        router.record("a", 0.01, False)
+        self.assertEqual(router.choose(), "b")
+        self.assertEqual(router.choose(exclude=["b"]), "a")
+
+        with mock.patch("ai.router.time.monotonic", return_value=10 ** 9):
+            self.assertEqual(router.choose(), "a")
+
+    def test_endpoint_that_only_failed_never_beats_a_measured_one(self):
+        router = EndpointRouter([("a", 1), ("b", 1)])
+        router.record("a", 0.001, False)
+        router.record("b", 0.1, True)
+        self.assertEqual(router.choose(), "b")
+        with mock.patch("ai.router.time.monotonic", return_value=10 ** 9):
+            self.assertEqual(router.choose(), "b")
+        self.assertEqual(router.choose(exclude=["b"]), "a")
+
+
+class _TwoStubsMixin(StubProxyMixin):
+
+    def setUp(self):
+        super().setUp()
+        self.other = StubAIProxy().start()
+        self.addCleanup(self.other.stop)
+        self.set_env(AI_PROXY_BASE_URLS=f"{self.stub.base_url},{self.other.base_url}")
+
+
+def _silent_server():
+    """A listener that accepts connections and never answers, to force read timeouts."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    accepted = []
+
+    def accept():
+        while True:
+            try:
+                accepted.append(server.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+
+    def close():
+        for connection in accepted:
+            connection.close()
+        server.close()
+
+    return f"http://127.0.0.1:{server.getsockname()[1]}", close
+
+
+class EndpointRoutingTests(StubProxyMixin, TestCase):
+
+    def test_refused_connection_fails_over_to_next_endpoint(self):
+        self.set_env(AI_PROXY_BASE_URLS=f"http://127.0.0.1:1=10,{self.stub.base_url}")
+        response = local_ai_api.create_response(PAYLOAD)
+        self.assertTrue(response["success"])
+        self.assertEqual(self.stub.stats["submits"], 1)
+
+    def test_read_timeout_is_not_resubmitted_elsewhere(self):
+        silent_url, close = _silent_server()
+        self.addCleanup(close)
+        self.set_env(AI_PROXY_BASE_URLS=f"{silent_url}=10,{self.stub.base_url}", AI_TIMEOUT="1")
+
+        response = local_ai_api.request(None, dict(PAYLOAD))
+        self.assertFalse(response["success"])
+        self.assertEqual(response["error"], "request_failed")
+        self.assertEqual(self.stub.stats["submits"], 0)
+
+    def test_only_502_and_503_are_resubmitted_elsewhere(self):
+        gateway = "http://gateway.invalid"
+        self.set_env(AI_PROXY_BASE_URLS=f"{gateway}=10,{self.stub.base_url}")
+        exchange = local_ai_api._http_exchange
+
+        for status, resubmitted in ((502, True), (503, True), (504, False)):
+            def answer(url, *args, status=status):
+                if url.startswith(gateway):
+                    return {"success": False, "status": status, "error": "gateway"}, True
+                return exchange(url, *args)
+
+            submits = self.stub.stats["submits"]
+            with mock.patch.object(local_ai_api, "_http_exchange", side_effect=answer):
+                response = local_ai_api.request(None, dict(PAYLOAD))
+            self.assertEqual(response["success"], resubmitted, status)
+            self.assertEqual(self.stub.stats["submits"] - submits, int(resubmitted), status)
+            local_ai_api._CONFIG_CACHE = None
+
+
+class StatusPinningTests(_TwoStubsMixin, TestCase):
+
+    def test_request_reports_accepting_endpoint_for_status_polls(self):
+        router = local_ai_api._config()["router"]
+        for _ in range(6):
+            route = {}
+            submitted = local_ai_api.request(None, dict(PAYLOAD), {"route": route})
+            accepting = route["base_url"]
+            # Make the other endpoint look strictly better for unrouted traffic.
+            other = self.other.base_url if accepting == self.stub.base_url else self.stub.base_url
+            router.record(accepting, 5.0, True)
+            router.record(other, 0.001, True)
+
+            response = local_ai_api.await_response(submitted["data"]["ai_request_id"],
+                                                   {"interval": 1, "timeout": 5, "base_url": accepting})
+            self.assertTrue(response["success"], response)
+
+        self.assertEqual(self.stub.stats["submits"], self.stub.stats["polls"])
+        self.assertEqual(self.other.stats["submits"], self.other.stats["polls"])
+
+    def test_concurrent_jobs_with_colliding_ids_get_their_own_answers(self):
+        # Both stubs number their jobs from 1, so every id is issued twice.
+        self.stub.queue_delay = self.other.queue_delay = 1.0
+        endpoints = itertools.cycle([self.stub.base_url, self.other.base_url])
+        router = local_ai_api._config()["router"]
+        results = {}
+
+        def job(model):
+            results[model] = local_ai_api.create_response({**PAYLOAD, "model": model}, {"poll_interval": 1})
+
+        with mock.patch.object(router, "choose", side_effect=lambda exclude=(): next(endpoints)):
+            threads = [threading.Thread(target=job, args=(f"model-{index}",)) for index in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.stub.stats["submits"], 3)
+        self.assertEqual(self.other.stats["submits"], 3)
+        for model, response in results.items():
+            self.assertTrue(response["success"], response)
+            self.assertEqual(response["data"]["model"], model)
+
+    def test_results_keep_their_original_shape(self):
+        route = {}
+        submitted = local_ai_api.request(None, dict(PAYLOAD), {"route": route})
+        self.assertEqual(set(submitted), {"success", "status", "data"})
+        self.assertEqual(set(route), {"base_url"})
+        status = local_ai_api.fetch_status(submitted["data"]["ai_request_id"], route)
+        self.assertEqual(set(status), {"success", "status", "data"})
+        failed = local_ai_api.request("http://127.0.0.1:1/ai-request", dict(PAYLOAD))
+        self.assertEqual(set(failed), {"success", "error", "message"})
+
+
+class MinifyCssTests(TestCase):
+
+    def test_empty_custom_property_keeps_its_space(self):
+        css = ".btn-close {\n  --bs-btn-close-filter: ;\n}\n.carousel { --bs-carousel-control-icon-filter: ; color: red; }"
+        self.assertEqual(
+            minify_css(css),
+            ".btn-close{--bs-btn-close-filter: }.carousel{--bs-carousel-control-icon-filter: ;color:red}",
+        )
+
+    def test_strings_and_licence_comments_survive(self):
+        css = "/*! Licence */\na::after { content: \"a ; b { }\" ; /* dropped */ margin:  0 auto; }"
+        self.assertEqual(minify_css(css), '/*! Licence */\na::after{content:"a ; b { }";margin:0 auto}')
+
+
+class CriticalCssTests(TestCase):
+
+    def test_keeps_only_rules_the_templates_can_match(self):
+        css = minify_css("""
+            :root { --c: red; }
+            body { margin: 0; }
+            .card, .modal { padding: 1rem; }
+            .btn:not(.disabled) { color: blue; }
+            table td { border: 0; }
+            @media (min-width: 576px) { .container { max-width: 540px; } .navbar { x: y; } }
+            @media print { .navbar { display: none; } }
+            @keyframes spin { to { transform: rotate(360deg); } }
+        """)
+        tokens = ({"html", "body", "div"}, {"card", "btn", "container"}, set())
+        self.assertEqual(
+            extract_critical_css(css, tokens),
+            ":root{--c:red}body{margin:0}.card{padding:1rem}.btn:not(.disabled){color:blue}"
+            "@media (min-width:576px){.container{max-width:540px}}",
+        )
+
+
+class BuildStaticTests(TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir, ignore_errors=True)
+        for relative, content in {
+            "static/css/one.css": ".one { color: red; }",
+            "static/css/two.css": ".two { color: blue; }",
+            "templates/page.html": '<div class="one"></div>',
+        }.items():
+            path = os.path.join(self.base_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(content)
+        self.build_dir = os.path.join(self.base_dir, "build", "static")
+        settings_override = override_settings(
+            BASE_DIR=self.base_dir,
+            STATIC_MANIFEST=os.path.join(self.base_dir, "static_manifest.json"),
+            STATIC_BUILD_DIR=self.build_dir,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def build(self, bundles):
+        manifest = {
+            "sources": ["static"],
+            "bundles": bundles,
+            "critical": {"bundle": "css/one.css", "templates": ["templates"]},
+        }
+        with open(os.path.join(self.base_dir, "static_manifest.json"), "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+        call_command("build_static", stdout=io.StringIO())
+
+    def built_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), self.build_dir)
+            for directory, _, names in os.walk(self.build_dir)
+            for name in names
+        )
+
+    def test_metadata_stays_out_of_the_published_tree(self):
+        self.build({"css/one.css": ["css/one.css"]})
+        self.assertEqual([name.split(".")[0] for name in self.built_files()], ["css/one"])
+        self.assertTrue(os.path.exists(os.path.join(self.base_dir, "build", "build-manifest.json")))
+        with open(os.path.join(self.base_dir, "build", "critical.css"), encoding="utf-8") as handle:
+            self.assertEqual(handle.read(), ".one{color:red}")
+
+    def test_removed_bundle_is_pruned(self):
+        self.build({"css/one.css": ["css/one.css"], "css/two.css": ["css/two.css"]})
+        self.assertEqual(len(self.built_files()), 2)
+        self.build({"css/one.css": ["css/one.css"]})
+        self.assertEqual([name.split(".")[0] for name in self.built_files()], ["css/one"])